@@ -1,5 +1,6 @@
 import ctypes
 import os
+import numpy as np
 
 here = os.path.dirname(os.path.abspath(__file__))
 ained_path = os.path.join(here, "ained_c.so")
@@ -36,6 +37,12 @@ lib_lo.ained_get_board.restype = ctypes.POINTER(ctypes.c_uint32)
 lib_lo.ained_free_pointer.argtypes = [ctypes.c_void_p]
 lib_lo.ained_flip_lights.argtypes = [ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
 lib_lo.ained_reconstruct_board.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32), ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
+lib_lo.ained_generate_solvable_board.argtypes = [ctypes.c_void_p, ctypes.c_uint64, ctypes.c_uint32, ctypes.c_uint32]
+lib_lo.ained_greedy_strategy.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_double), ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
+lib_lo.ained_greedy_strategy.restype = ctypes.c_uint32
+lib_lo.ained_chase_strategy.argtypes = [ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
+lib_lo.ained_chase_strategy.restype = ctypes.c_uint32
+lib_lo.ained_apply_pattern.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32), ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
 
 class AiNed:
     def __init__(self):
@@ -43,6 +50,8 @@ class AiNed:
         self.handle = lib.ained_init()
         self.length = ctypes.c_size_t()
         self.memory_ptr = lib.ained_get_memory(self.handle, ctypes.byref(self.length))
+        # The coefficients only change when they are set, so they are read from C once and cached until then
+        self._coeff_cache = None
 
     def get_bit(self, row, col):
         """Gets bit from memory given a row and a column"""
@@ -66,6 +75,11 @@ class AiNed:
         """Flips a light given start of board, size of board and coordinates within board"""
         lib_lo.ained_flip_lights(self.handle, start_row, start_col, num_row, num_col, row, col)
 
+    def apply_pattern(self, pattern, start_row, start_col, num_row, num_col):
+        """Flips the lights of every 1 in a 1D pattern of size num_row * num_col in a single call, given start of board and size of board"""
+        assert (len(pattern) == num_row * num_col), "Specified board size must be equal to the length of the 1D pattern that is to be applied"
+        lib_lo.ained_apply_pattern(self.handle, (ctypes.c_uint32 * len(pattern))(*pattern), start_row, start_col, num_row, num_col)
+
     def clear(self):
         """Sets all bits in memory to 0"""
         lib.ained_clear_memory(self.handle)
@@ -76,6 +90,7 @@ class AiNed:
         """
         assert (0 <= factor <= 1), "factor must be in range [0, 1]"
         lib.ained_set_coefficients_euclidean(self.handle, ctypes.c_float(factor), ctypes.c_uint32(reach), ctypes.c_int(co_index))
+        self._coeff_cache = None
 
     def set_coefficients_manhattan(self, factor: float, reach: int, co_index: int = 1):
         """Sets the coefficients of the coefficient matrix to certain values by using the Manhattan distance formula
@@ -83,17 +98,23 @@ class AiNed:
         """
         assert (0 <= factor <= 1), "factor must be in range [0, 1]"
         lib.ained_set_coefficients_manhattan(self.handle, ctypes.c_float(factor), ctypes.c_uint32(reach), ctypes.c_int(co_index))
+        self._coeff_cache = None
 
     def print_coefficients(self):
         """Prints the coefficients in a human-readable manner"""
         lib.ained_print_coefficients(self.handle)
 
     def get_coefficients(self):
-        """Returns a 1D array of size 25, containing the low coefficients from the coefficient matrix"""
-        pointer = lib.ained_get_coefficient_array(self.handle)
-        coeffs = [pointer[i] for i in range(25)]
-        lib_lo.ained_free_pointer(pointer)
-        return coeffs
+        """Returns a read-only 1D NumPy array of size 25, containing the low coefficients from the coefficient matrix"""
+        if self._coeff_cache is None:
+            pointer = lib.ained_get_coefficient_array(self.handle)
+            # Copying the whole C array at once instead of dereferencing the pointer per element
+            buffer = ctypes.cast(pointer, ctypes.POINTER(ctypes.c_float * 25)).contents
+            coeffs = np.frombuffer(buffer, dtype=np.float32).copy()
+            lib_lo.ained_free_pointer(pointer)
+            coeffs.flags.writeable = False
+            self._coeff_cache = coeffs
+        return self._coeff_cache
 
     def print_board(self, start_row, start_col, num_row, num_col):
         """Prints a board of given starting position and size in a human-readable manner"""
@@ -104,12 +125,28 @@ class AiNed:
         return lib_lo.ained_game_not_over(self.handle, start_row, start_col, num_row, num_col)
 
     def get_board(self, start_row, start_col, num_row, num_col):
-        """Returns a 1D array of the bits of size num_row * num_col of the specified board"""
+        """Returns a 1D NumPy array of the bits of size num_row * num_col of the specified board"""
         pointer = lib_lo.ained_get_board(self.handle, start_row, start_col, num_row, num_col)
-        board = [pointer[i] for i in range(num_row * num_col)]
+        # Copying the whole C array at once instead of dereferencing the pointer per element
+        buffer = ctypes.cast(pointer, ctypes.POINTER(ctypes.c_uint32 * (num_row * num_col))).contents
+        board = np.frombuffer(buffer, dtype=np.uint32).copy()
         lib_lo.ained_free_pointer(pointer)
         return board
 
+    def greedy_strategy(self, press_matrix, start_row, start_col, num_row, num_col, max_moves):
+        """Plays the greedy strategy on the specified board in C until it is solved or max_moves moves are made, given a press matrix with a row of num_row * num_col coefficients for every move. Returns the number of moves taken"""
+        assert (np.shape(press_matrix) == (num_row * num_col, num_row * num_col)), "Press matrix must have a row and a column for every light on the board"
+        press_matrix = np.ascontiguousarray(press_matrix, dtype=np.float64)
+        return lib_lo.ained_greedy_strategy(self.handle, press_matrix.ctypes.data_as(ctypes.POINTER(ctypes.c_double)), start_row, start_col, num_row, num_col, max_moves)
+
+    def chase_strategy(self, start_row, start_col, num_row, num_col, max_moves):
+        """Plays the chasing strategy on the specified board in C until it is solved or max_moves moves are made. Returns the number of moves taken"""
+        return lib_lo.ained_chase_strategy(self.handle, start_row, start_col, num_row, num_col, max_moves)
+
+    def generate_solvable_board(self, seed, start_row, start_col):
+        """Generates a random 5x5 board that is solvable in the deterministic version in the memory at the specified coordinates, given a seed for the random generator"""
+        lib_lo.ained_generate_solvable_board(self.handle, seed, start_row, start_col)
+
     def reconstruct_board(self, board, start_row, start_col, num_row, num_col):
         """Reconstructs a board according to a 1D array of size num_row * num_col in the memory at the specified coordinates"""
         assert (len(board) == num_row * num_col), "Specified board size must be equal to the length of the 1D board array that is to be reconstructed"
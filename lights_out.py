@@ -2,6 +2,13 @@ from shutil import move
 import ained
 import numpy as np
 
+# The size of the board. The quiet patterns, the pseudo-inverse matrix and the bitmasks below only hold for a 5x5 board,
+# which also makes sure a packed board of N * N = 25 bits fits in 32 bits
+N = 5
+
+# The number of moves a strategy plays in C before returning to Python, so the game can still be interrupted with Ctrl-C
+MOVES_PER_CALL = 1000
+
 # The quiet patterns from deterministic lights out theory
 quiet_patterns = ([
     [1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1],
@@ -36,95 +43,104 @@ a_inv = np.array([
     [0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 1, 0, 0, 0, 1, 1, 0, 1, 1, 0, 1, 0, 0, 0],
     [0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0],
     [1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1]
-])
+], dtype=np.uint8)
+
+# Packing a 1D array of bits into a single integer, where bit i holds element i
+def pack_bits(bits):
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+# Unpacking an integer into a 1D array of its lowest n bits
+def unpack_bits(value, n):
+    return np.unpackbits(np.frombuffer(value.to_bytes((n + 7) // 8, 'little'), dtype=np.uint8), count=n, bitorder='little')
+
+# The rows of the pseudo-inverse matrix and the quiet patterns as bitmasks, so the modulo 2 arithmetic becomes bit operations
+a_inv_masks = [pack_bits(row) for row in a_inv]
+qp_bits = [pack_bits(qp) for qp in quiet_patterns]
+
+# Returning the pattern with the least number of presses out of a solve pattern and its sums with the quiet patterns modulo 2.
+# On a tie the earliest candidate wins, so the basic pattern is kept unless a quiet pattern strictly improves it
+def fewest_presses(basic_pattern):
+    candidates = [basic_pattern] + [basic_pattern ^ qp for qp in qp_bits]
+    return min(candidates, key=int.bit_count)
+
+# Distances between every move (x, y) and every cell (row, col), indexed as [x, y, row, col]
+_cells = np.arange(N)
+_row_diff = np.abs(_cells[None, None, :, None] - _cells[:, None, None, None])
+_col_diff = np.abs(_cells[None, None, None, :] - _cells[None, :, None, None])
+# Index into the coefficient array for every move and cell, and which cells are part of the cross
+press_index = _row_diff * 5 + _col_diff
+press_cross = (_row_diff + _col_diff) == 1
 
 class Board:
-    def __init__(self, N):
-        self.N = N
+    def __init__(self):
+        # Random generator used for the board states and random moves
+        self.rng = np.random.default_rng()
         # Creating the AiNed instance
         self.ai = ained.AiNed()
+        # The coefficient array the press tensor was last built from
+        self._press_coeffs = None
         self.generate_board() # Random board state
+
+    # The coefficient matrix of every possible move, indexed as [x, y, row, col]. The AiNed instance hands out the same coefficient array
+    # until the coefficients are set, so the tensor is only rebuilt when that array changes
+    @property
+    def press_tensor(self):
+        coeffs = self.ai.get_coefficients()
+        if coeffs is not self._press_coeffs:
+            self._press_tensor = np.where(press_cross, 1.0, coeffs.astype(np.float64)[press_index])
+            # The tensor is shared by every move, so it is handed out read-only
+            self._press_tensor.flags.writeable = False
+            self._press_coeffs = coeffs
+        return self._press_tensor
+
+    # Without coefficients outside of the pressed light, a press only flips the cross and the game is deterministic.
+    # Read from the coefficients of the AiNed instance, so it is also correct when they are set there directly
+    @property
+    def deterministic(self):
+        return not self.ai.get_coefficients()[1:].any()
     
     # Generating a random board state untill one is found that is solvable in the deterministic version
     def generate_board(self):
-        while True:
-            print("Generating a board...")
-            board = np.random.randint(0, 2, self.N * self.N).tolist()
-            if self.is_solvable(board):
-                self.ai.reconstruct_board(board, 0, 0, self.N, self.N)
-                self.ai.commit()
-                return
+        print("Generating a board...")
+        # The random boards are drawn and checked in C, seeded from the random generator of the board
+        self.ai.generate_solvable_board(int(self.rng.integers(2**63)), 0, 0)
+        self.ai.commit()
 
-    # Checking if the board is solvable in the deterministic version using the quiet patterns
-    def is_solvable(self, board):
-        for qp in quiet_patterns:
-            overlap = np.sum((np.array(board) * np.array(qp)))
-            if not overlap % 2 == 0:
-                return False
-        return True
-    
-    # Finding a solution pattern using the pseudo-inverse matrix
+    # Reading the board and packing it into a bitmask, where bit row * N + col holds the light at (row, col)
+    def _board_bits(self):
+        return pack_bits(self.ai.get_board(0, 0, N, N))
+
+    # Finding a solution pattern using the pseudo-inverse matrix, returned as a bitmask
     def basic_solve(self):
-        board = self.ai.get_board(0, 0, self.N, self.N)
-        solution_vector = np.dot(a_inv, np.array(board).reshape(self.N * self.N)) % 2 # % 2 possible because of modulo 2 arithmetic
-        return solution_vector.tolist()
+        board_bits = self._board_bits()
+        solution_bits = 0
+        for i, mask in enumerate(a_inv_masks):
+            # The dot product of a row with the board modulo 2 is the parity of their overlap
+            solution_bits |= ((board_bits & mask).bit_count() & 1) << i
+        return solution_bits
 
     # Finding the solution pattern with the least number of presses based on the basic solve pattern and the quiet patterns
     def optimal_solve(self):
-        basic_pattern = self.basic_solve()
-        best_pattern = basic_pattern
-        for qp in quiet_patterns:
-            # Taking the sum of the solve pattern and the quiet pattern modulo 2
-            result = [(a + b) % 2 for a, b in zip(basic_pattern, qp)]
-            # Accept if the new solve pattern has less presses
-            if sum(result) < sum(best_pattern):
-                best_pattern = result
-        return np.array(best_pattern).reshape(self.N, self.N)
+        best_pattern = fewest_presses(self.basic_solve())
+        return unpack_bits(best_pattern, N * N).reshape(N, N)
     
-    # Returns the move that maximizes the probability of turing lights off and minizes the probability of turning lights on using the coefficient matrix
-    def greedy_move(self):
-        values = np.zeros((self.N, self.N))
-        board = np.array(self.ai.get_board(0, 0, self.N, self.N)).reshape(self.N, self.N)
-        # The negative image of the board: inverting 0s to 1s and 1s to 0s
-        negative_board = (board + 1)%2 # % 2 possible because of modulo 2 arithmetic
-        # Calculating the value of each possible move
-        for row in range(self.N):
-            for col in range(self.N):
-                coeffs = self.get_coefficients(row, col)
-                # Positive effect: probability ofturning lights off
-                positive = board * coeffs
-                # Negative effect: probability of turning lights on
-                negative = negative_board * coeffs
-                values[row][col] = np.sum(positive) - np.sum(negative)
-        # Selecting the move with the highest value
-        move = np.unravel_index(np.argmax(values), values.shape)
-        return move
-
     # Getting the coefficient matrix for a specific move
     def get_coefficients(self, x, y):
-        coeffs = self.ai.get_coefficients()
-        press_coeffs = np.zeros((self.N, self.N))
-        for row in range(self.N):
-            for col in range(self.N):
-                row_diff = abs(row - x)
-                col_diff = abs(col - y)
-                press_coeffs[row][col] = coeffs[row_diff * 5 + col_diff]
-                if row_diff + col_diff == 1: # Part of the cross
-                    press_coeffs[row][col] = 1
-
-        return press_coeffs
+        return self.press_tensor[x, y]
 
     # Printing the current board state and the optimal (deterministic) solve pattern next to each other
     def print_board(self):
-        board = np.array(self.ai.get_board(0, 0, self.N, self.N)).reshape(self.N, self.N)
-        solve_pattern = self.optimal_solve()
-        print("Board:        Optimal solve pattern:")
+        board = self.ai.get_board(0, 0, N, N).reshape(N, N).tolist()
+        solve_pattern = self.optimal_solve().tolist()
+        # Formatting all rows first and printing them in one call
+        lines = ["Board:        Optimal solve pattern:"]
         for row_b, row_s in zip(board, solve_pattern):
-            print(' '.join(str(cell) for cell in row_b), "   ", ' '.join(str(cell) for cell in row_s))
+            lines.append(' '.join(map(str, row_b)) + "     " + ' '.join(map(str, row_s)))
+        print('\n'.join(lines))
 
 # Mode where the user manually inputs the moves
 # Returns the number of moves taken to solve the board
-def play_manually(my_board, N):
+def play_manually(my_board):
     counter = 0
     while my_board.ai.game_not_over(0, 0, N, N):
         my_board.print_board()
@@ -148,87 +164,67 @@ def play_manually(my_board, N):
 
 # mode where it automatically solves the board using a strategy that is efficient for deterministic games
 # Returns the number of moves taken to solve the board
-def deterministic_strategy(my_board, N):
+def deterministic_strategy(my_board):
     counter = 0
     while my_board.ai.game_not_over(0, 0, N, N):
         #my_board.print_board()
-        solve_pattern = my_board.optimal_solve()
-        pressed = False
-        for row in range(N):
-            for col in range(N):
-                if solve_pattern[row][col] == 1:
-                    my_board.ai.flip_lights(0, 0, N, N, row, col)
-                    counter += 1
-                    pressed = True
-                    # Recalculate the solve pattern after each move
-                    break
-            # Recalculate the solve pattern after each move
-            if pressed:
-                break
+        solve_pattern = my_board.optimal_solve().ravel()
+        if solve_pattern.any() and my_board.deterministic:
+            # The solve pattern stays valid in deterministic games, so the whole pattern is pressed at once
+            my_board.ai.apply_pattern(solve_pattern, 0, 0, N, N)
+            counter += int(np.count_nonzero(solve_pattern))
+        elif solve_pattern.any():
+            # Pressing the first light of the solve pattern, then recalculating the solve pattern after the move
+            row, col = divmod(int(np.argmax(solve_pattern)), N)
+            my_board.ai.flip_lights(0, 0, N, N, row, col)
+            counter += 1
         # If the solve pattern is all zeros, but board is not solved (can happen for deterministically unsolvable board states in stochastic games),
         # make a random fallback move
-        if not pressed:
-            my_board.ai.flip_lights(0, 0, N, N, np.random.randint(0, N), np.random.randint(0, N))
+        else:
+            row, col = my_board.rng.integers(0, N, 2)
+            my_board.ai.flip_lights(0, 0, N, N, row, col)
     my_board.print_board()
     print("Congratulations! You've solved the puzzle in", counter, "moves.")
     return counter
 
 # mode where it automatically solves the board using a greedy strategy
 # Returns the number of moves taken to solve the board
-def greedy_strategy(my_board, N):
+def greedy_strategy(my_board):
     counter = 0
+    press_matrix = my_board.press_tensor.reshape(N * N, N * N)
     while my_board.ai.game_not_over(0, 0, N, N):
-        #my_board.print_board()
-        # Getting the most valuable move according to the greedy algorithm
-        move = my_board.greedy_move()
-        my_board.ai.flip_lights(0, 0, N, N, move[0], move[1])
-        counter += 1
+        # The moves are played in C in chunks, pressing the move that maximizes the probability of turning lights off and minimizes the
+        # probability of turning lights on each turn, scored with a row of the press tensor per move
+        counter += my_board.ai.greedy_strategy(press_matrix, 0, 0, N, N, MOVES_PER_CALL)
     my_board.print_board()
     print("Congratulations! You've solved the puzzle in", counter, "moves.")
     return counter
 
-def chase_strategy(my_board, N):
+# mode where it automatically solves the board by chasing the lights down to the bottom row
+# Returns the number of moves taken to solve the board
+def chase_strategy(my_board):
     counter = 0
     while my_board.ai.game_not_over(0, 0, N, N):
-        #my_board.print_board()
-        pressed = False
-        for row in range(N):
-            for col in range(N):
-                board = my_board.ai.get_board(0, 0, N, N)
-                if board[row * N + col] == 1:
-                    if row < N - 1:
-                        my_board.ai.flip_lights(0, 0, N, N, row + 1, col)
-                    elif col < N - 1:
-                        my_board.ai.flip_lights(0, 0, N, N, row, col + 1)
-                    else:
-                        my_board.ai.flip_lights(0, 0, N, N, row, col)
-                    counter += 1
-                    pressed = True
-                    break
-            if pressed:
-                break
+        # The moves are played in C in chunks, pressing the light below the first light that is on each turn
+        counter += my_board.ai.chase_strategy(0, 0, N, N, MOVES_PER_CALL)
     my_board.print_board()
     print("Congratulations! You've solved the puzzle in", counter, "moves.")
     return counter
 
 # Running a specified number of games based on a manhattan coefficient factor, reach and strategy and returning the results
-def run_test(N, manhattan_factor, reach, strategy, runs):
-    results = np.array([])
-    my_board = Board(N)
+def run_test(manhattan_factor, reach, strategy, runs):
+    results = np.empty(runs, dtype=np.int32)
+    my_board = Board()
     my_board.ai.set_coefficients_manhattan(manhattan_factor, reach)
     my_board.ai.print_coefficients()
-    for _ in range(runs):
+    for i in range(runs):
         # Generating a new starting pattern for each run
         my_board.generate_board()
         # Using the strategy chosen by the user
-        count = strategy(my_board, N)
-        results = np.append(results, count)
-    mean = np.mean(results)
-    median = np.median(results)
-    p10 = np.percentile(results, 10)
-    p25 = np.percentile(results, 25)
-    p75 = np.percentile(results, 75)
-    p90 = np.percentile(results, 90)
+        results[i] = strategy(my_board)
+    mean = results.mean(dtype=np.float64)
+    # Computing all percentiles in one call, so the results are only sorted once
+    p10, p25, median, p75, p90 = np.percentile(results, [10, 25, 50, 75, 90])
     
     print(f"{runs} runs completed.")
     print(f"Strategy: {strategy.__name__}, Factor: {manhattan_factor}, Reach: {reach}")
@@ -264,8 +260,7 @@ def user_interface():
 
 # Running a single game using the strategy chosen by the user
 def single_game():
-    N = 5
-    my_board = Board(N)
+    my_board = Board()
 
     manhattan_factor, reach = user_interface()
     
@@ -274,13 +269,13 @@ def single_game():
 
     mode = input("Choose strattegy: (1) deterministic, (2) greedy, (3) chasing, (4) play manually: ")
     if mode == '1':
-        deterministic_strategy(my_board, N)
+        deterministic_strategy(my_board)
     elif mode == '2':
-        greedy_strategy(my_board, N)
+        greedy_strategy(my_board)
     elif mode == '3':
-        chase_strategy(my_board, N)
+        chase_strategy(my_board)
     elif mode == '4':
-        play_manually(my_board, N)
+        play_manually(my_board)
 
 # Main loop for user interaction, where user can choose to play a single game or run a number of games to get results
 def main():
@@ -289,7 +284,6 @@ def main():
         if choice == '1':
             single_game()
         elif choice == '2':
-            N = 5
             manhattan_factor, reach = user_interface()
             runs = int(input("Enter number of test runs: "))
             strategy_choice = input("Choose a strategy: (1) deterministic, (2) greedy, (3) chasing: ")
@@ -302,7 +296,7 @@ def main():
             else:
                 print("Invalid strategy choice.")
                 continue
-            run_test(N, manhattan_factor, reach, strategy, runs)
+            run_test(manhattan_factor, reach, strategy, runs)
         elif choice.lower() == 'q':
             print("Exiting the game. Goodbye!")
             break
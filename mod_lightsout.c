@@ -93,3 +93,110 @@ void ained_reconstruct_board(ained_t *handle, uint32_t *board, uint32_t start_ro
 	ained_commit(handle);
 	ained_set_bypass(handle, false);
 }
+
+void ained_apply_pattern(ained_t *handle, uint32_t *pattern, uint32_t start_row, uint32_t start_col, uint32_t num_row, uint32_t num_col){
+	for(uint32_t row = 0; row < num_row; row++){
+		for(uint32_t col = 0; col < num_col; col++){
+			if(pattern[row * num_col + col] == 1){
+				ained_flip_lights(handle, start_row, start_col, num_row, num_col, row, col);
+			}
+		}
+	}
+}
+
+/*
+ * Checks if a packed 5x5 board, where bit i holds cell i, is solvable in the deterministic version: its overlap with each of the three
+ * quiet patterns must be even.
+ */
+static bool is_solvable_bits(uint32_t bits){
+	static const uint32_t quiet_patterns[3] = { 0x015A82B5, 0x01B06C1B, 0x00EAEEAE };
+	for(uint32_t k = 0; k < 3; k++){
+		if(__builtin_parity(bits & quiet_patterns[k])){
+			return false;
+		}
+	}
+	return true;
+}
+
+/*
+ * Draws random 5x5 boards until one is found that is solvable in the deterministic version and reconstructs it in the memory at the
+ * specified coordinates. The boards are drawn from a splitmix64 generator started at the given seed
+ */
+void ained_generate_solvable_board(ained_t *handle, uint64_t seed, uint32_t start_row, uint32_t start_col){
+	uint64_t state = seed;
+	uint32_t bits;
+	do {
+		state += 0x9E3779B97F4A7C15ULL;
+		uint64_t z = state;
+		z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+		z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+		z = z ^ (z >> 31);
+		bits = (uint32_t)(z >> 39); // Upper 25 bits
+	} while(!is_solvable_bits(bits));
+
+	uint32_t board[25];
+	for(uint32_t i = 0; i < 25; i++){
+		board[i] = (bits >> i) & 1;
+	}
+	ained_reconstruct_board(handle, board, start_row, start_col, 5, 5);
+}
+
+/*
+ * Plays a whole game with the greedy strategy: every move presses the light that maximizes the probability of turning lights off and
+ * minimizes the probability of turning lights on. The press matrix has a row of num_row * num_col coefficients for every move, so
+ * press_matrix[move * num_row * num_col + cell] is the probability that pressing move flips cell. Stops when the board is solved or
+ * after max_moves moves, so the caller can check whether the game is over. Returns the number of moves taken
+ */
+uint32_t ained_greedy_strategy(ained_t *handle, const double *press_matrix, uint32_t start_row, uint32_t start_col, uint32_t num_row, uint32_t num_col, uint32_t max_moves){
+	uint32_t num_cells = num_row * num_col;
+	uint32_t counter = 0;
+	while(counter < max_moves && ained_game_not_over(handle, start_row, start_col, num_row, num_col)){
+		uint32_t *board = ained_get_board(handle, start_row, start_col, num_row, num_col);
+		double best_value = 0;
+		uint32_t best_move = 0;
+		for(uint32_t move = 0; move < num_cells; move++){
+			const double *coeffs = &press_matrix[move * num_cells];
+			double value = 0;
+			for(uint32_t cell = 0; cell < num_cells; cell++){
+				// Lights that are on count positively, lights that are off count negatively
+				value += (board[cell] == 1) ? coeffs[cell] : -coeffs[cell];
+			}
+			// Keeping the first move with the highest value
+			if(move == 0 || value > best_value){
+				best_value = value;
+				best_move = move;
+			}
+		}
+		free(board);
+		ained_flip_lights(handle, start_row, start_col, num_row, num_col, best_move / num_col, best_move % num_col);
+		counter++;
+	}
+	return counter;
+}
+
+/*
+ * Plays a whole game with the chasing strategy: every move presses the light below the first light that is on, or the one to the right
+ * of it on the last row. Stops when the board is solved or after max_moves moves, so the caller can check whether the game is over.
+ * Returns the number of moves taken
+ */
+uint32_t ained_chase_strategy(ained_t *handle, uint32_t start_row, uint32_t start_col, uint32_t num_row, uint32_t num_col, uint32_t max_moves){
+	uint32_t counter = 0;
+	while(counter < max_moves && ained_game_not_over(handle, start_row, start_col, num_row, num_col)){
+		// Finding the first light that is on, the game not being over guarantees there is one
+		uint32_t index = 0;
+		while(ained_get_bit(handle, start_row + index / num_col, start_col + index % num_col) == 0){
+			index++;
+		}
+		uint32_t row = index / num_col;
+		uint32_t col = index % num_col;
+		if(row < num_row - 1){
+			ained_flip_lights(handle, start_row, start_col, num_row, num_col, row + 1, col);
+		} else if(col < num_col - 1){
+			ained_flip_lights(handle, start_row, start_col, num_row, num_col, row, col + 1);
+		} else {
+			ained_flip_lights(handle, start_row, start_col, num_row, num_col, row, col);
+		}
+		counter++;
+	}
+	return counter;
+}